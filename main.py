@@ -41,6 +41,18 @@ INVERSE_MACRO = ['VXX', 'UUP']
 REFRESH_RATE_SECONDS = 30
 HISTORY_REFRESH_CYCLES = 10
 
+# fast_info fields that only change once per trading day; everything else
+# (last_price, last_volume, pre/post market prices, ...) expires each cycle
+FAST_INFO_DAILY_FIELDS = (
+    'previous_close',
+    'regular_market_previous_close',
+    'three_month_average_volume',
+    'ten_day_average_volume',
+)
+FAST_INFO_TTL_SECONDS = REFRESH_RATE_SECONDS
+
+CONTEXT_BRIDGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "context_bridge.json")
+
 session = requests.Session()
 session.headers.update({
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -61,13 +73,234 @@ class MarketDataCache:
         self.overnight_return = {}
         self.pre_market_price = {}
         self.after_hours_price = {}
+        self.regular_market_price = {}
         self.cycles = 0
         self.vwap_pointer = 0
 
     def clear(self):
         self.__init__()
 
+class TickerPool:
+    """Long-lived yf.Ticker objects keyed by symbol, with TTL-cached fast_info fields."""
+
+    def __init__(self):
+        self.tickers = {}
+        self.fast_info = {}          # (symbol, field) -> (value, session_key, fetched_at)
+        self.fast_info_sources = {}  # symbol -> (yf.Ticker used only for fast_info, built_at)
+
+    def get(self, symbol):
+        t_obj = self.tickers.get(symbol)
+        if t_obj is None:
+            t_obj = yf.Ticker(symbol)
+            self.tickers[symbol] = t_obj
+        return t_obj
+
+    def _fast_info_source(self, symbol, now):
+        # yfinance memoises fast_info values on the Ticker, so a fresh Ticker is
+        # built each TTL to back fast_info; the pooled one keeps its own caches
+        source = self.fast_info_sources.get(symbol)
+        if source is None or now - source[1] >= FAST_INFO_TTL_SECONDS:
+            source = (yf.Ticker(symbol), now)
+            self.fast_info_sources[symbol] = source
+        return source[0]
+
+    def _is_fresh(self, field, cached, now):
+        value, session_key, fetched_at = cached
+        if now - fetched_at < FAST_INFO_TTL_SECONDS:
+            return True
+        # Failed lookups only ever live for the short TTL
+        if field in FAST_INFO_DAILY_FIELDS and value is not None:
+            return session_key == get_session_key()
+        return False
+
+    def get_fast_info(self, symbol, field):
+        now = t_time.monotonic()
+        cached = self.fast_info.get((symbol, field))
+        if cached is not None and self._is_fresh(field, cached, now):
+            return cached[0]
+
+        value = None
+        try:
+            value = getattr(self._fast_info_source(symbol, now).fast_info, field, None)
+        except:
+            pass
+
+        self.fast_info[(symbol, field)] = (value, get_session_key(), now)
+        return value
+
+    def clear(self):
+        self.__init__()
+
+class Portfolio:
+    """Positions from context_bridge.json, marked to market from the cached snapshot."""
+
+    def __init__(self, path=CONTEXT_BRIDGE_PATH):
+        self.path = path
+        self.mtime = None
+        self.failed_mtime = None
+        self.cash = 0.0
+        self.cash_currency = None
+        self.tickers = []
+        self.statuses = []
+        self.shares = np.zeros(0)
+        self.wac = np.zeros(0)
+        self.cost_basis = np.zeros(0)
+        self.prices = np.zeros(0)
+        self.session_bases = np.zeros(0)
+        self.session_prices = np.zeros(0)
+        self.market_value = np.zeros(0)
+        self.unrealized_pnl = np.zeros(0)
+        self.session_move = np.zeros(0)
+        self.status = None
+
+    def load(self):
+        # A stat per cycle is enough to pick up manual edits of the bridge file
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime in (self.mtime, self.failed_mtime):
+            return
+
+        # Parse into locals so a bad hand edit keeps the last good positions
+        try:
+            with open(self.path) as f:
+                engine = json.load(f).get('context_engine', {})
+            positions = engine.get('portfolio_snapshot', [])
+            tickers = [str(p['ticker']) for p in positions]
+            statuses = [p.get('status', '') for p in positions]
+            shares = np.array([float(p.get('shares', 0)) for p in positions], dtype=float)
+            wac = np.array([float(p.get('wac', 0)) for p in positions], dtype=float)
+            cash, cash_currency = parse_cash(engine.get('cash_remaining', 0))
+        except Exception as e:
+            print("Portfolio load error:", e)
+            self.failed_mtime = mtime
+            return
+
+        n = len(positions)
+        self.mtime = mtime
+        self.failed_mtime = None
+        self.cash = cash
+        self.cash_currency = cash_currency
+        self.tickers = tickers
+        self.statuses = statuses
+        self.shares = shares
+        self.wac = wac
+        self.cost_basis = shares * wac
+        self.prices = np.full(n, np.nan)
+        self.session_bases = np.full(n, np.nan)
+        self.session_prices = np.full(n, np.nan)
+        self.market_value = np.full(n, np.nan)
+        self.unrealized_pnl = np.full(n, np.nan)
+        self.session_move = np.full(n, np.nan)
+
+        # Marks were reset above; rebuild them from the cache so a reload
+        # never leaves /portfolio blank until the next /data cycle
+        if self.status is not None:
+            self._remark(self.status)
+
+    def mark(self, status):
+        """Re-mark positions whose price inputs changed since the last cycle."""
+        self.status = status
+        self.load()
+        self._remark(status)
+
+    def _remark(self, status):
+        if not self.tickers:
+            return
+
+        def column(source):
+            return np.array([source.get(sym, 0) or np.nan for sym in self.tickers], dtype=float)
+
+        prices = column(cache.prices)
+        # The session move is measured from the close that opened the session:
+        # the prior close for pre-market/regular hours, today's close after hours
+        session_bases = np.array(
+            [cache.technicals.get(sym, {}).get("Last_Reg_Close", 0.0) or np.nan for sym in self.tickers],
+            dtype=float
+        )
+        if status == "PRE-MARKET":
+            session_prices = column(cache.pre_market_price)
+        elif status == "AFTER-HOURS":
+            session_prices = column(cache.after_hours_price)
+            session_bases = column(cache.regular_market_price)
+        else:
+            session_prices = prices.copy()
+        session_prices = np.where(np.isnan(session_prices), prices, session_prices)
+
+        def changed(new, old):
+            return ~((new == old) | (np.isnan(new) & np.isnan(old)))
+
+        dirty = changed(prices, self.prices) | changed(session_bases, self.session_bases) | changed(session_prices, self.session_prices)
+        if not dirty.any():
+            return
+
+        self.prices[dirty] = prices[dirty]
+        self.session_bases[dirty] = session_bases[dirty]
+        self.session_prices[dirty] = session_prices[dirty]
+
+        shares = self.shares[dirty]
+        self.market_value[dirty] = shares * prices[dirty]
+        self.unrealized_pnl[dirty] = self.market_value[dirty] - self.cost_basis[dirty]
+        self.session_move[dirty] = shares * (session_prices[dirty] - session_bases[dirty])
+
+    def snapshot(self):
+        self.load()
+        priced = ~np.isnan(self.market_value)
+        total_mv = float(self.market_value[priced].sum())
+        total_cost = float(self.cost_basis[priced].sum())
+        total_pnl = float(self.unrealized_pnl[priced].sum())
+        moved = ~np.isnan(self.session_move)
+        total_move = float(self.session_move[moved].sum())
+        base_value = float((self.shares[moved] * self.session_bases[moved]).sum())
+
+        def value(arr, i):
+            return float(arr[i]) if not np.isnan(arr[i]) else 0.0
+
+        positions = []
+        for i, sym in enumerate(self.tickers):
+            cost = float(self.cost_basis[i])
+            mv = value(self.market_value, i)
+            pnl = value(self.unrealized_pnl, i)
+            move = value(self.session_move, i)
+            base = value(self.session_bases, i)
+            positions.append({
+                "ticker": sym,
+                "status": self.statuses[i],
+                "shares": float(self.shares[i]),
+                "wac": float(self.wac[i]),
+                "price": value(self.prices, i),
+                "session_price": value(self.session_prices, i),
+                "session_base": base,
+                "cost_basis": cost,
+                "market_value": mv,
+                "unrealized_pnl": pnl,
+                "unrealized_pnl_percent": (pnl / cost) * 100 if cost > 0 and priced[i] else 0.0,
+                "session_move": move,
+                "session_move_percent": (move / (float(self.shares[i]) * base)) * 100 if base > 0 and self.shares[i] > 0 else 0.0,
+                "exposure_percent": (mv / total_mv) * 100 if total_mv > 0 else 0.0,
+                "priced": bool(priced[i])
+            })
+
+        return {
+            "session": self.status,
+            # Cash stays in its own currency; exposure_percent is each position's
+            # share of the USD market value and never includes cash
+            "cash": {"amount": self.cash, "currency": self.cash_currency},
+            "positions": positions,
+            "totals": {
+                "cost_basis": total_cost,
+                "market_value": total_mv,
+                "unrealized_pnl": total_pnl,
+                "unrealized_pnl_percent": (total_pnl / total_cost) * 100 if total_cost > 0 else 0.0,
+                "session_move": total_move,
+                "session_move_percent": (total_move / base_value) * 100 if base_value > 0 else 0.0
+            }
+        }
+
 cache = MarketDataCache()
+ticker_pool = TickerPool()
+portfolio = Portfolio()
 app = FastAPI()
 
 # -----------------------------
@@ -86,6 +319,37 @@ def get_market_status():
         return "AFTER-HOURS"
     return "CLOSED"
 
+def get_session_key():
+    # Trading sessions roll over when pre-market opens, not at midnight, so
+    # daily values fetched overnight are refreshed once the new session starts
+    ny_now = datetime.now(ZoneInfo("America/New_York"))
+    return (ny_now - timedelta(hours=4)).date()
+
+CURRENCY_SYMBOLS = {'€': 'EUR', '$': 'USD', '£': 'GBP'}
+
+def parse_cash(val):
+    """Split a bridge cash string like '2570€' into (amount, currency code).
+
+    The amount is None when it can't be parsed, so a bad cash field never
+    blocks the positions from loading.
+    """
+    text = str(val).strip()
+    code = re.sub(r"[0-9.,\-\s]", "", text)
+    amount = re.sub(r"[^0-9.,\-]", "", text)
+
+    # Hand-edited euro amounts use a decimal comma ('2570,50', '2.570,50');
+    # the rightmost separator is the decimal point, the other is thousands
+    if ',' in amount and ('.' not in amount or amount.rfind(',') > amount.rfind('.')):
+        amount = amount.replace('.', '').replace(',', '.')
+    else:
+        amount = amount.replace(',', '')
+
+    try:
+        amount = float(amount)
+    except ValueError:
+        amount = None
+    return amount, CURRENCY_SYMBOLS.get(code, code or None)
+
 def to_float(val):
     try:
         if isinstance(val, (pd.Series, pd.DataFrame)):
@@ -321,11 +585,10 @@ def update_history_and_technicals(symbol, t_obj):
 
             # --- Previous Regular Close ---
             last_reg_close = 0.0
-            if hasattr(t_obj, 'fast_info'):
-                try:
-                    last_reg_close = float(t_obj.fast_info.previous_close)
-                except:
-                    pass
+            try:
+                last_reg_close = float(ticker_pool.get_fast_info(symbol, 'previous_close') or 0.0)
+            except:
+                pass
 
             if last_reg_close == 0.0 and len(close) >= 2:
                 last_reg_close = to_float(close.iloc[-2])
@@ -361,7 +624,7 @@ def update_history_and_technicals(symbol, t_obj):
             pass
 
 
-def update_price_tick(symbol, t_obj, status, quote_data=None):
+def update_price_tick(symbol, status, quote_data=None):
     price = 0.0
     vol = 0
     used_batch = False
@@ -384,6 +647,8 @@ def update_price_tick(symbol, t_obj, status, quote_data=None):
             pre_price = quote_data.get('preMarketPrice')
             post_price = quote_data.get('postMarketPrice')
             reg_price = quote_data.get('regularMarketPrice')
+            if reg_price:
+                cache.regular_market_price[symbol] = float(reg_price)
             vol = int(quote_data.get('regularMarketVolume', 0) or 0)
             used_batch = True
         except:
@@ -410,18 +675,20 @@ def update_price_tick(symbol, t_obj, status, quote_data=None):
         if fh_c:
             price = fh_c
 
-    # --- Final fallback to fast_info ---
+    # --- Final fallback to pooled fast_info ---
+    def fi(field):
+        return ticker_pool.get_fast_info(symbol, field)
+
     try:
-        fi = t_obj.fast_info
         if vol == 0:
-            vol = fi.last_volume or fi.three_month_average_volume
+            vol = int(fi('last_volume') or fi('three_month_average_volume') or 0)
         if price == 0:
-            if status == "PRE-MARKET" and getattr(fi, 'pre_market_price', None):
-                price = float(fi.pre_market_price)
-            elif status == "AFTER-HOURS" and getattr(fi, 'post_market_price', None):
-                price = float(fi.post_market_price)
-            elif getattr(fi, 'last_price', None):
-                price = float(fi.last_price)
+            if status == "PRE-MARKET" and fi('pre_market_price'):
+                price = float(fi('pre_market_price'))
+            elif status == "AFTER-HOURS" and fi('post_market_price'):
+                price = float(fi('post_market_price'))
+            elif fi('last_price'):
+                price = float(fi('last_price'))
     except:
         pass
 
@@ -576,7 +843,7 @@ def get_data():
     ny_now = datetime.now(ZoneInfo("America/New_York"))
     status = get_market_status()
     
-    tickers_obj = {sym: yf.Ticker(sym) for sym in TICKERS}
+    tickers_obj = {sym: ticker_pool.get(sym) for sym in TICKERS}
 
     for sym, obj in tickers_obj.items():
         update_history_and_technicals(sym, obj)
@@ -590,8 +857,13 @@ def get_data():
         if v_true > 0:
             cache.vwaps[sym] = v_true
             
-    for sym, obj in tickers_obj.items():
-        update_price_tick(sym, obj, status, batch_quotes.get(sym))
+    for sym in TICKERS:
+        update_price_tick(sym, status, batch_quotes.get(sym))
+
+    try:
+        portfolio.mark(status)
+    except Exception as e:
+        print("Portfolio error:", e)
 
     data = []
     for sym in TICKERS:
@@ -658,16 +930,23 @@ def get_data():
     }
     return final_output
 
+@app.get("/portfolio")
+def get_portfolio():
+    # Marks come from the last /data snapshot; no upstream calls are made here
+    return portfolio.snapshot()
+
 @app.post("/symbols")
 def update_symbols(new_tickers: list[str]):
     global TICKERS
     TICKERS = new_tickers
     cache.clear()
+    ticker_pool.clear()
     return {"message": "Symbols updated successfully. Cache cleared."}
 
 @app.post("/cache/reset")
 def reset_cache():
     cache.clear()
+    ticker_pool.clear()
     return {"message": "Cache cleared successfully."}
 
 app.mount("/", StaticFiles(directory="public", html=True), name="static")